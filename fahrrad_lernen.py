@@ -12,9 +12,22 @@
 #
 # Run (inside venv):
 #   python3 fahrrad_lernen.py
+#
+# Smart mode (stop when good enough or when time is up):
+#   python3 fahrrad_lernen.py --budget-min 30            # train at most 30 minutes
+#   python3 fahrrad_lernen.py --target-acc 0.90          # stop at 90% test accuracy
+#   python3 fahrrad_lernen.py --budget-min 30 --target-acc 0.90
+#
+# If training crashes or you press Ctrl+C, just start it again:
+# it continues from the last finished epoch (saved in training_backup/).
 
+import argparse
+import json
+import math
 import os
 import random
+import shutil
+import time
 import numpy as np
 import tensorflow as tf
 
@@ -38,6 +51,18 @@ CLASSES = ["bicycle", "not_bicycle"]
 
 MODEL_H5 = "mein_fahrrad_modell.h5"
 
+# Smart mode (only used with --budget-min and/or --target-acc)
+MAX_EPOCHS = 100            # upper limit, usually we stop much earlier
+EARLY_STOP_PATIENCE = 5     # stop if test accuracy did not improve for this many epochs
+LR_PATIENCE = 2             # halve the learning rate after this many epochs without progress
+MIN_LR = 1e-5
+
+# Resume after a crash / Ctrl+C (removed by this script when training finishes)
+BACKUP_DIR = "training_backup"
+BEST_JSON = os.path.join(BACKUP_DIR, "best.json")
+# Files BackupAndRestore writes (Keras 3 / tf.keras 2.x)
+BACKUP_FILES = ("latest.weights.h5", "training_metadata.json", os.path.join("chief", "checkpoint"))
+
 # -----------------------------
 # Reproducibility
 # -----------------------------
@@ -94,10 +119,127 @@ def print_dataset_report():
     print("  not_bicycle = 1")
 
 
+# -----------------------------
+# Smart mode callbacks
+# -----------------------------
+class TimeBudget(tf.keras.callbacks.Callback):
+    """Stop before the wall-clock budget (seconds) runs out. Counts earlier, interrupted runs too."""
+
+    def __init__(self, seconds: float, state: "TrainingState"):
+        super().__init__()
+        self.seconds = seconds
+        self.state = state
+
+    def on_train_begin(self, logs=None):
+        self.run_start = time.monotonic()
+        self.epochs_done = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        # Hard stop inside a (long) epoch
+        if self.state.elapsed() >= self.seconds:
+            self.model.stop_training = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epochs_done += 1
+        elapsed = self.state.elapsed()
+        per_epoch = (time.monotonic() - self.run_start) / self.epochs_done
+        # Do not start an epoch that cannot finish in time
+        if elapsed + per_epoch > self.seconds:
+            print(f"\nTime budget reached ({elapsed / 60:.1f} of {self.seconds / 60:.1f} min). Stopping.")
+            self.model.stop_training = True
+
+
+class TargetAccuracy(tf.keras.callbacks.Callback):
+    """Stop as soon as the test (validation) accuracy is good enough."""
+
+    def __init__(self, target: float):
+        super().__init__()
+        self.target = target
+
+    def on_epoch_end(self, epoch, logs=None):
+        acc = (logs or {}).get("val_accuracy")
+        if acc is not None and acc >= self.target:
+            print(f"\nTarget accuracy reached: {acc:.4f} >= {self.target:.4f}. Stopping.")
+            self.model.stop_training = True
+
+
+class TrainingState(tf.keras.callbacks.Callback):
+    """
+    Smart-mode state that must survive a crash, saved in BEST_JSON next to
+    the BackupAndRestore files after every epoch:
+      val_accuracy: best test accuracy so far (for the checkpoint)
+      wait:         epochs since that best (for early stopping)
+      elapsed_s:    training time already used (for the time budget)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.best, self.wait, self.elapsed_before = -math.inf, 0, 0.0
+        if os.path.isfile(BEST_JSON):
+            with open(BEST_JSON) as f:
+                saved = json.load(f)
+            self.best = float(saved["val_accuracy"])
+            self.wait = int(saved.get("wait", 0))
+            self.elapsed_before = float(saved.get("elapsed_s", 0.0))
+        self.start = time.monotonic()
+
+    def elapsed(self) -> float:
+        return self.elapsed_before + time.monotonic() - self.start
+
+    def on_train_begin(self, logs=None):
+        self.start = time.monotonic()
+
+    def on_epoch_end(self, epoch, logs=None):
+        acc = (logs or {}).get("val_accuracy")
+        if acc is not None and acc > self.best:
+            self.best, self.wait = float(acc), 0
+        else:
+            self.wait += 1
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        with open(BEST_JSON, "w") as f:
+            json.dump({"val_accuracy": self.best, "wait": self.wait, "elapsed_s": self.elapsed()}, f)
+
+
+class ResumableEarlyStopping(tf.keras.callbacks.EarlyStopping):
+    """EarlyStopping that keeps its best value and patience counter after a resume."""
+
+    def __init__(self, state: TrainingState, **kwargs):
+        super().__init__(**kwargs)
+        self.state = state
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if self.state.best != -math.inf:
+            self.best = self.state.best
+            self.wait = self.state.wait
+
+
+def has_backup() -> bool:
+    """True only if BackupAndRestore really left a checkpoint to resume from."""
+    return any(os.path.exists(os.path.join(BACKUP_DIR, name)) for name in BACKUP_FILES)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the bicycle / not_bicycle CNN")
+    parser.add_argument("--budget-min", type=float, default=None,
+                        help="stop training after this many minutes (smart mode)")
+    parser.add_argument("--target-acc", type=float, default=None,
+                        help="stop when test accuracy reaches this value, e.g. 0.90 (smart mode)")
+    args = parser.parse_args()
+    if args.target_acc is not None and not 0.0 < args.target_acc <= 1.0:
+        parser.error(f"--target-acc must be between 0 and 1 (e.g. 0.90 for 90%), got {args.target_acc:g}")
+    if args.budget_min is not None and args.budget_min <= 0:
+        parser.error(f"--budget-min must be greater than 0, got {args.budget_min:g}")
+    return args
+
+
 # -----------------------------
 # Main Training Script
 # -----------------------------
 def main():
+    args = parse_args()
+    smart = args.budget_min is not None or args.target_acc is not None
+
     print_dataset_report()
 
     # Data generators
@@ -161,22 +303,80 @@ def main():
     print("Be patient: Raspberry Pi may be slower than a big PC.\n")
 
     steps_per_epoch = max(1, train_gen.samples // BATCH_SIZE)
-    validation_steps = max(1, test_gen.samples // BATCH_SIZE)
+    # Round up: every test image counts (early stopping relies on it)
+    validation_steps = max(1, math.ceil(test_gen.samples / BATCH_SIZE))
+
+    # Resume from the last finished epoch if a previous run was interrupted
+    if has_backup():
+        print(f"Found '{BACKUP_DIR}/' -> resuming the interrupted training.\n")
+    elif os.path.isfile(BEST_JSON):
+        # State without a checkpoint belongs to an old run -> start fresh
+        os.remove(BEST_JSON)
+    callbacks = [tf.keras.callbacks.BackupAndRestore(backup_dir=BACKUP_DIR)]
+
+    if smart:
+        state = TrainingState()
+        if state.elapsed_before > 0:
+            print(f"Resumed: {state.elapsed_before / 60:.1f} min already used, best test accuracy {state.best:.4f}.")
+        print("Smart mode:"
+              + (f" time budget {args.budget_min:g} min" if args.budget_min is not None else "")
+              + (f" target accuracy {args.target_acc:g}" if args.target_acc is not None else "")
+              + f" (max {MAX_EPOCHS} epochs)\n")
+        callbacks += [
+            # Keep the best model (by test accuracy) in MODEL_H5
+            tf.keras.callbacks.ModelCheckpoint(
+                MODEL_H5,
+                monitor="val_accuracy",
+                mode="max",
+                save_best_only=True,
+                initial_value_threshold=None if state.best == -math.inf else state.best,
+                verbose=1
+            ),
+            state,
+            ResumableEarlyStopping(
+                state,
+                monitor="val_accuracy",
+                mode="max",
+                patience=EARLY_STOP_PATIENCE,
+                verbose=1
+            ),
+            tf.keras.callbacks.ReduceLROnPlateau(
+                monitor="val_loss",
+                factor=0.5,
+                patience=LR_PATIENCE,
+                min_lr=MIN_LR,
+                verbose=1
+            ),
+        ]
+        if args.target_acc is not None:
+            callbacks.append(TargetAccuracy(args.target_acc))
+        if args.budget_min is not None:
+            callbacks.append(TimeBudget(args.budget_min * 60.0, state))
 
     history = model.fit(
         train_gen,
         steps_per_epoch=steps_per_epoch,
-        epochs=EPOCHS,
+        epochs=MAX_EPOCHS if smart else EPOCHS,
         validation_data=test_gen,
-        validation_steps=validation_steps
+        validation_steps=validation_steps,
+        callbacks=callbacks
     )
 
+    # Finished normally (also after early stop / budget / target): nothing to
+    # resume. Older tf.keras only deletes its own files, so remove the folder here.
+    shutil.rmtree(BACKUP_DIR, ignore_errors=True)
+
+    if smart and os.path.isfile(MODEL_H5):
+        # Evaluate (and keep) the best checkpoint, not the last epoch
+        model.load_weights(MODEL_H5)
+
     print("\n=== Evaluation on test set (one pass) ===")
     loss, acc = model.evaluate(test_gen, verbose=1)
     print(f"Test accuracy: {acc:.4f}   Test loss: {loss:.4f}")
 
-    # Save model for testen.py
-    model.save(MODEL_H5)
+    # Save model for testen.py (smart mode already saved the best one)
+    if not smart:
+        model.save(MODEL_H5)
     print(f"\n=== Done! Saved as '{MODEL_H5}' ===")
     print("Next step: run the GUI tester:")
     print("  python3 testen.py")
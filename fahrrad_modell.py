@@ -0,0 +1,169 @@
+# fahrrad_modell.py
+# Load the bicycle model and predict images -- no GUI code in here.
+#
+# Used by testen.py (GUI) and ordner_beobachten.py (headless daemon), so the
+# daemon also runs on Pi OS Lite without python3-tk.
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from numpy_inferenz import MODEL_NPZ, load_image_array, load_numpy_model, pick_model_file
+
+MODEL_PATH = "mein_fahrrad_modell.h5"
+IMG_SIZE = (150, 150)           # must match training
+
+# Tiled mode (find small bicycles in big photos)
+TILE_SCALES = (1.0, 0.5, 0.3)   # window size as part of the shorter image side, big -> small
+TILE_OVERLAP = 0.5              # neighbouring windows overlap by half
+TILE_EARLY_EXIT = 0.90          # stop searching once a window is this sure it is a bicycle
+
+# Training folder mapping (most common):
+# bicycle = 0, not_bicycle = 1
+# model output = sigmoid -> probability of class 1 (not_bicycle)
+# so:
+#   prob_not_bicycle = pred
+#   prob_bicycle     = 1 - pred
+
+# Which engine runs the model:
+#   auto       -> TensorFlow if installed, else NumPy (numpy_inferenz.py)
+#   numpy      -> never import TensorFlow (fast start for kiosks)
+#   tensorflow -> always TensorFlow
+ENGINE = os.environ.get("FAHRRAD_ENGINE", "auto").strip().lower()
+
+
+# ---------------------------
+# Optional TensorFlow
+# ---------------------------
+TF_AVAILABLE = False
+load_model = None
+if ENGINE != "numpy":
+    try:
+        from tensorflow.keras.models import load_model  # type: ignore
+        TF_AVAILABLE = True
+    except Exception:
+        if ENGINE == "tensorflow":
+            raise
+        TF_AVAILABLE = False
+        load_model = None
+
+
+# ---------------------------
+# Prediction
+# ---------------------------
+def is_image_file(path: str) -> bool:
+    return path.lower().endswith((".jpg", ".jpeg", ".png"))
+
+
+def load_any_model():
+    """Load the model with TensorFlow, or with the NumPy engine if TF is missing."""
+    if TF_AVAILABLE:
+        return load_model(MODEL_PATH, compile=False)
+    # Prefer an up-to-date exported .npz (no h5py needed), else read the .h5 directly
+    return load_numpy_model(pick_model_file(MODEL_PATH, MODEL_NPZ))
+
+
+def label_from_pred(pred: float) -> Tuple[str, float, float, float]:
+    """Turn the sigmoid output (0..1) into (label_key, conf, p_bike, p_not)."""
+    p_not = pred
+    p_bike = 1.0 - pred
+
+    if p_bike >= p_not:
+        return "BICYCLE", p_bike, p_bike, p_not
+    return "NOT_BICYCLE", p_not, p_bike, p_not
+
+
+def predict_batch(model, batch: np.ndarray) -> List[Tuple[str, float, float, float]]:
+    """
+    Predict many images in one model call.
+    batch: (N, 150, 150, 3), already scaled to 0..1.
+    Returns one (label_key, conf, p_bike, p_not) per image.
+    """
+    preds = model.predict(batch, verbose=0)[:, 0]  # sigmoid outputs (0..1)
+    return [label_from_pred(float(p)) for p in preds]
+
+
+def predict_image(model, path: str) -> Tuple[str, float, float, float]:
+    """
+    Predict one image.
+    Returns:
+      label_key: "BICYCLE" or "NOT_BICYCLE"
+      conf: confidence of the winning label (0..1)
+      p_bike: probability of bicycle (0..1)
+      p_not: probability of not_bicycle (0..1)
+    """
+    arr = load_image_array(path, target_size=IMG_SIZE) / 255.0
+    arr = np.expand_dims(arr, axis=0)
+
+    return predict_batch(model, arr)[0]
+
+
+def tile_boxes(width: int, height: int, scale: float, overlap: float = TILE_OVERLAP) -> List[Tuple[int, int, int, int]]:
+    """Square, overlapping windows (x0, y0, x1, y1) that cover the whole image."""
+    side = max(1, int(round(min(width, height) * scale)))
+    step = max(1, int(side * (1.0 - overlap)))
+
+    def starts(size: int) -> List[int]:
+        pos = list(range(0, size - side + 1, step))
+        if pos[-1] != size - side:
+            pos.append(size - side)  # last window touches the border
+        return pos
+
+    return [(x, y, x + side, y + side) for y in starts(height) for x in starts(width)]
+
+
+def predict_image_tiled(model, path: str, scales=TILE_SCALES, early_exit: float = TILE_EARLY_EXIT
+                        ) -> Tuple[str, float, float, float, Optional[Tuple[int, int, int, int]]]:
+    """
+    Predict one (big) image by looking at many smaller windows.
+
+    The whole photo and all windows of one scale go to the model in one
+    batch, biggest scale first. If a window is already very sure it sees a
+    bicycle, smaller scales are skipped. Scales whose windows would be
+    smaller than 150x150 pixels are never used (upscaled crops give false
+    bicycles), so small photos only get the whole-photo check.
+
+    Returns the same values as predict_image plus:
+      box: best bicycle region (x0, y0, x1, y1) in original pixels, or None
+           (None also when the whole photo scored best)
+    """
+    with Image.open(path) as img:
+        orig_w, orig_h = img.size
+        # JPEG: decode at reduced size, just big enough for the smallest window
+        smallest = min(orig_w, orig_h) * min(scales)
+        if smallest > IMG_SIZE[0]:
+            f = IMG_SIZE[0] / smallest
+            img.draft("RGB", (int(orig_w * f) + 1, int(orig_h * f) + 1))
+        img = img.convert("RGB")  # uint8, no float copy of the full picture
+
+    w, h = img.size
+    fx, fy = orig_w / w, orig_h / h
+
+    # One batch per usable scale; the whole photo goes into the first one
+    batches = [tile_boxes(w, h, sc) for sc in scales if int(round(min(w, h) * sc)) >= IMG_SIZE[0]]
+    if not batches:
+        batches = [[]]
+    batches[0].insert(0, (0, 0, w, h))  # the whole photo, like predict_image
+
+    best_p, best_box = -1.0, None
+    for boxes in batches:
+        # Crop + resize each window straight to 150x150 (uint8)
+        tiles = np.empty((len(boxes), IMG_SIZE[0], IMG_SIZE[1], 3), dtype=np.uint8)
+        for j, box in enumerate(boxes):
+            tiles[j] = np.asarray(img.resize((IMG_SIZE[1], IMG_SIZE[0]), Image.NEAREST, box=box))
+
+        results = predict_batch(model, tiles.astype(np.float32) / 255.0)
+        j = max(range(len(results)), key=lambda k: results[k][2])
+        if results[j][2] > best_p:
+            best_p, best_box = results[j][2], boxes[j]
+        if best_p >= early_exit:
+            break
+
+    label_key, conf, p_bike, p_not = label_from_pred(1.0 - best_p)
+    box = None
+    if label_key == "BICYCLE" and best_box != (0, 0, w, h):
+        x0, y0, x1, y1 = best_box
+        box = (int(x0 * fx), int(y0 * fy), int(round(x1 * fx)), int(round(y1 * fy)))
+    return label_key, conf, p_bike, p_not, box
@@ -0,0 +1,367 @@
+# numpy_inferenz.py
+# Run the trained bicycle CNN with plain NumPy (no TensorFlow needed).
+#
+# The model from fahrrad_lernen.py is tiny (3x Conv2D + MaxPooling2D, Flatten,
+# Dense, sigmoid). Importing TensorFlow just to run it costs seconds of
+# startup and hundreds of MB of RAM, so this file re-implements the forward
+# pass with vectorized NumPy (im2col via stride tricks, whole batches at once).
+#
+# Model files it can read:
+#   mein_fahrrad_modell.h5    (needs: pip install h5py)
+#   mein_fahrrad_modell.npz   (only NumPy, create it once with "export")
+#
+# Run (inside venv):
+#   python3 numpy_inferenz.py export                  # .h5 -> .npz
+#   python3 numpy_inferenz.py check  bild.jpg ...     # compare with Keras
+#   python3 numpy_inferenz.py bench  bild.jpg         # startup time + RAM of testen.py
+#
+# The exported .npz is only used while it is at least as new as the .h5
+# (after retraining: export again).
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PIL import Image
+
+MODEL_H5 = "mein_fahrrad_modell.h5"
+MODEL_NPZ = "mein_fahrrad_modell.npz"
+IMG_SIZE = (150, 150)           # must match training
+
+# Outputs must match Keras within this tolerance (float32 math)
+MATCH_ATOL = 1e-4
+
+SUPPORTED_LAYERS = ("InputLayer", "Conv2D", "MaxPooling2D", "Flatten", "Dense")
+
+
+# ---------------------------
+# Image loading (same as Keras)
+# ---------------------------
+def load_image_array(path: str, target_size=IMG_SIZE) -> np.ndarray:
+    """
+    Load one image exactly like keras_image.load_img + img_to_array:
+    RGB, nearest-neighbour resize, float32 in 0..255. Shape: (H, W, 3).
+    """
+    with Image.open(path) as img:
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img = img.resize((target_size[1], target_size[0]), Image.NEAREST)
+        return np.asarray(img, dtype=np.float32)
+
+
+# ---------------------------
+# Activations
+# ---------------------------
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # Numerically stable for large |x|
+    out = np.empty_like(x)
+    pos = x >= 0
+    out[pos] = 1.0 / (1.0 + np.exp(-x[pos]))
+    ex = np.exp(x[~pos])
+    out[~pos] = ex / (1.0 + ex)
+    return out
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "sigmoid": _sigmoid,
+    "softmax": _softmax,
+}
+
+
+# ---------------------------
+# Layers (NHWC, like Keras "channels_last")
+# ---------------------------
+def _same_padding(size: int, k: int, s: int):
+    out = -(-size // s)
+    total = max((out - 1) * s + k - size, 0)
+    return total // 2, total - total // 2
+
+
+def _pad_same(x: np.ndarray, k, s, value=0.0) -> np.ndarray:
+    ph = _same_padding(x.shape[1], k[0], s[0])
+    pw = _same_padding(x.shape[2], k[1], s[1])
+    if ph == (0, 0) and pw == (0, 0):
+        return x
+    return np.pad(x, ((0, 0), ph, pw, (0, 0)), constant_values=value)
+
+
+def conv2d(x: np.ndarray, kernel: np.ndarray, bias: Optional[np.ndarray], strides, padding: str) -> np.ndarray:
+    """Conv2D forward pass. x: (N, H, W, C), kernel: (kh, kw, C, F)."""
+    kh, kw = kernel.shape[:2]
+    if padding == "same":
+        x = _pad_same(x, (kh, kw), strides)
+    # (N, H', W', C, kh, kw) view -> no copy until the matrix multiply
+    win = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    out = np.tensordot(win, kernel, axes=((3, 4, 5), (2, 0, 1)))
+    if bias is not None:
+        out += bias
+    return out
+
+
+def max_pool2d(x: np.ndarray, pool, strides, padding: str) -> np.ndarray:
+    """MaxPooling2D forward pass. x: (N, H, W, C)."""
+    if padding == "same":
+        x = _pad_same(x, pool, strides, value=-np.inf)
+    n, h, w, c = x.shape
+    ph, pw = pool
+    if tuple(pool) == tuple(strides):
+        # Fast path (the usual 2x2/2): crop + reshape, no window copy
+        oh, ow = h // ph, w // pw
+        x = x[:, :oh * ph, :ow * pw]
+        return x.reshape(n, oh, ph, ow, pw, c).max(axis=(2, 4))
+    win = sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    return win.max(axis=(4, 5))
+
+
+# ---------------------------
+# Model
+# ---------------------------
+class NumpyModel:
+    """
+    Tiny forward-only copy of the Keras model.
+
+    Has the same predict(x, verbose=0) call as a Keras model, so
+    testen.predict_image() works with both.
+    """
+
+    def __init__(self, layers: List[Dict], weights: List[List[np.ndarray]]):
+        if len(layers) != len(weights):
+            raise ValueError("Every layer needs a weights list (may be empty).")
+        self.layers = layers
+        self.weights = [[np.asarray(w, dtype=np.float32) for w in ws] for ws in weights]
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        for spec, ws in zip(self.layers, self.weights):
+            kind = spec["type"]
+            if kind == "Conv2D":
+                x = conv2d(x, ws[0], ws[1] if len(ws) > 1 else None, spec["strides"], spec["padding"])
+            elif kind == "MaxPooling2D":
+                x = max_pool2d(x, spec["pool_size"], spec["strides"], spec["padding"])
+            elif kind == "Flatten":
+                x = x.reshape(x.shape[0], -1)
+            elif kind == "Dense":
+                x = x @ ws[0]
+                if len(ws) > 1:
+                    x += ws[1]
+            x = ACTIVATIONS[spec.get("activation", "linear")](x)
+        return x
+
+    def predict(self, x: np.ndarray, batch_size: int = 32, verbose: int = 0) -> np.ndarray:
+        """Run a batch (N, H, W, 3) through the network. Returns (N, outputs)."""
+        x = np.asarray(x, dtype=np.float32)
+        if x.shape[0] <= batch_size:
+            return self._forward(x)
+        parts = [self._forward(x[i:i + batch_size]) for i in range(0, x.shape[0], batch_size)]
+        return np.concatenate(parts, axis=0)
+
+    def save_npz(self, path: str):
+        arrays = {f"w_{i}_{j}": w for i, ws in enumerate(self.weights) for j, w in enumerate(ws)}
+        np.savez(path, layers=np.array(json.dumps(self.layers)), **arrays)
+
+
+def _layer_spec(class_name: str, cfg: Dict) -> Dict:
+    if class_name not in SUPPORTED_LAYERS:
+        raise ValueError(f"Layer type not supported by the NumPy engine: {class_name}")
+    if cfg.get("data_format", "channels_last") != "channels_last":
+        raise ValueError("Only data_format='channels_last' is supported.")
+
+    spec = {"type": class_name, "name": cfg.get("name", "")}
+    if class_name in ("Conv2D", "Dense"):
+        activation = cfg.get("activation", "linear")
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Activation not supported by the NumPy engine: {activation}")
+        spec["activation"] = activation
+    if class_name == "Conv2D":
+        if tuple(cfg.get("dilation_rate", (1, 1))) != (1, 1):
+            raise ValueError("Conv2D with dilation_rate != 1 is not supported.")
+        spec["strides"] = list(cfg.get("strides", (1, 1)))
+        spec["padding"] = cfg.get("padding", "valid")
+    elif class_name == "MaxPooling2D":
+        pool = list(cfg.get("pool_size", (2, 2)))
+        spec["pool_size"] = pool
+        spec["strides"] = list(cfg.get("strides") or pool)
+        spec["padding"] = cfg.get("padding", "valid")
+    return spec
+
+
+def _h5_attr_list(group, name: str) -> List[str]:
+    # Keras splits long attribute lists into name0, name1, ...
+    if name in group.attrs:
+        values = list(group.attrs[name])
+    else:
+        values, i = [], 0
+        while f"{name}{i}" in group.attrs:
+            values.extend(group.attrs[f"{name}{i}"])
+            i += 1
+    return [v.decode("utf8") if isinstance(v, bytes) else str(v) for v in values]
+
+
+def load_h5(path: str) -> NumpyModel:
+    """Read architecture + weights from a Keras .h5 file (needs h5py, not TensorFlow)."""
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        raw = f.attrs.get("model_config")
+        if raw is None:
+            raise ValueError(f"No model_config in {path} (was it saved with model.save?)")
+        config = json.loads(raw.decode("utf8") if isinstance(raw, bytes) else raw)
+        if config.get("class_name") != "Sequential":
+            raise ValueError("Only Sequential models are supported.")
+
+        weights_root = f["model_weights"] if "model_weights" in f else f
+        layers, weights = [], []
+        for layer in config["config"]["layers"]:
+            spec = _layer_spec(layer["class_name"], layer["config"])
+            if spec["type"] == "InputLayer":
+                continue
+            ws = []
+            if spec["name"] in weights_root:
+                g = weights_root[spec["name"]]
+                ws = [np.asarray(g[n]) for n in _h5_attr_list(g, "weight_names")]
+            layers.append(spec)
+            weights.append(ws)
+    return NumpyModel(layers, weights)
+
+
+def load_npz(path: str) -> NumpyModel:
+    """Read a model written by NumpyModel.save_npz (only NumPy needed)."""
+    with np.load(path) as data:
+        layers = json.loads(str(data["layers"]))
+        weights = []
+        for i in range(len(layers)):
+            ws, j = [], 0
+            while f"w_{i}_{j}" in data:
+                ws.append(data[f"w_{i}_{j}"])
+                j += 1
+            weights.append(ws)
+    return NumpyModel(layers, weights)
+
+
+def pick_model_file(h5_path: str = MODEL_H5, npz_path: str = MODEL_NPZ) -> str:
+    """
+    Use the exported .npz only if it is at least as new as the .h5.
+    After retraining, the old .npz would otherwise keep running silently.
+    """
+    if not os.path.isfile(npz_path):
+        return h5_path
+    if os.path.isfile(h5_path) and os.path.getmtime(npz_path) < os.path.getmtime(h5_path):
+        print(f"WARNING: {npz_path} is older than {h5_path} -> using {h5_path}.\n"
+              f"Re-export it with: python3 numpy_inferenz.py export", file=sys.stderr)
+        return h5_path
+    return npz_path
+
+
+def load_numpy_model(path: str) -> NumpyModel:
+    if path.lower().endswith(".npz"):
+        return load_npz(path)
+    return load_h5(path)
+
+
+# ---------------------------
+# Command line: export / check / bench
+# ---------------------------
+def _load_batch(paths: List[str]) -> np.ndarray:
+    return np.stack([load_image_array(p) for p in paths]) / 255.0
+
+
+def cmd_export(args):
+    model = load_h5(args.model)
+    model.save_npz(args.out)
+    print(f"Saved NumPy weights: {args.out}")
+
+
+def cmd_check(args):
+    from tensorflow.keras.models import load_model
+
+    model_path = args.model or pick_model_file()
+    # Keras must load the same model: the .h5 itself, or --h5 for an exported .npz
+    h5_path = args.h5 or (MODEL_H5 if model_path.lower().endswith(".npz") else model_path)
+    print(f"NumPy: {model_path}   Keras: {h5_path}")
+
+    batch = _load_batch(args.images)
+    ours = load_numpy_model(model_path).predict(batch)
+    keras = load_model(h5_path, compile=False).predict(batch, verbose=0)
+    diff = float(np.max(np.abs(ours - keras)))
+    print(f"Images: {len(args.images)}   max |numpy - keras| = {diff:.2e}   (allowed: {MATCH_ATOL:.0e})")
+    if diff > MATCH_ATOL:
+        print("MISMATCH: NumPy engine does not match Keras!")
+        sys.exit(1)
+    print("OK: outputs match.")
+
+
+# Runs in a fresh interpreter and goes through testen.py exactly like the
+# kiosk does, so interpreter start + all imports are part of "startup".
+_BENCH_CHILD = """
+import json, os, resource, sys, time
+t_spawn = float(sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+import testen
+model = testen.load_any_model()
+t_load = time.time() - t_spawn
+testen.predict_image(model, sys.argv[3])
+t_first = time.time() - t_spawn
+t1 = time.perf_counter()
+for _ in range(10):
+    testen.predict_image(model, sys.argv[3])
+t_pred = (time.perf_counter() - t1) / 10
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+print(json.dumps({"load": t_load, "first": t_first, "predict": t_pred, "rss_mb": rss_mb}))
+"""
+
+
+def cmd_bench(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'engine':<12}{'startup (s)':>12}{'1st pred (s)':>14}{'pred (ms)':>11}{'max RSS (MB)':>14}")
+    for engine in ("tensorflow", "numpy"):
+        env = dict(os.environ, FAHRRAD_ENGINE=engine)
+        proc = subprocess.run(
+            [sys.executable, "-c", _BENCH_CHILD, repr(time.time()), here, args.image],
+            capture_output=True, text=True, env=env
+        )
+        if proc.returncode != 0:
+            print(f"{engine:<12}failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else '?'}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{engine:<12}{r['load']:>12.2f}{r['first']:>14.2f}{r['predict'] * 1000:>11.1f}{r['rss_mb']:>14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy inference engine for the bicycle model")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("export", help="convert the .h5 model to a NumPy-only .npz file")
+    p.add_argument("--model", default=MODEL_H5)
+    p.add_argument("--out", default=MODEL_NPZ)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("check", help="compare NumPy outputs with Keras (needs TensorFlow)")
+    p.add_argument("images", nargs="+")
+    p.add_argument("--model", default=None,
+                   help="model for the NumPy engine (.h5 or .npz, default: newest of the two)")
+    p.add_argument("--h5", default=None,
+                   help=f"model for Keras when --model is an .npz (default: {MODEL_H5})")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("bench", help="startup time and RAM of testen.py: TensorFlow vs NumPy")
+    p.add_argument("image")
+    p.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
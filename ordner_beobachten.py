@@ -0,0 +1,337 @@
+# ordner_beobachten.py
+# Watch a folder and classify every new JPG/PNG automatically (daemon mode).
+#
+# Cameras upload pictures into a folder. This script waits until each file
+# is completely written, classifies new files in batches (same logic as
+# predict_image in fahrrad_modell.py) and writes the results into a SQLite journal.
+#
+# After a restart it continues where it stopped: files that are already in
+# the journal (same path, size and modification time) are not classified
+# again. Paths are stored as absolute real paths, so "kamera" and
+# "/home/pi/kamera" (or a systemd unit with another working directory)
+# share the same journal entries.
+#
+# How new files are noticed:
+#   Linux   -> inotify (instant, no extra package needed)
+#   other   -> polling the folder every --poll seconds
+#
+# Run (inside venv):
+#   python3 ordner_beobachten.py /home/pi/kamera_uploads
+#   python3 ordner_beobachten.py /home/pi/kamera_uploads --db ergebnisse.sqlite --batch-size 8
+#
+# Show the latest results:
+#   sqlite3 ergebnisse.sqlite "SELECT path, label, p_bike FROM results ORDER BY id DESC LIMIT 20"
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import sqlite3
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fahrrad_modell import IMG_SIZE, is_image_file, load_any_model, predict_batch
+from numpy_inferenz import load_image_array
+
+# -----------------------------
+# Settings (Pi-friendly)
+# -----------------------------
+DB_PATH = "ergebnisse.sqlite"
+BATCH_SIZE = 16          # images per model call (also limits RAM)
+SETTLE_SECONDS = 2.0     # file must stay unchanged this long before we read it
+POLL_SECONDS = 1.0       # polling interval (and check interval while files settle)
+RESCAN_SECONDS = 60.0    # full folder scan as a safety net (also with inotify)
+NICE = 10                # lower CPU priority so the camera upload stays fast
+
+# inotify constants (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+# -----------------------------
+# Results journal (SQLite)
+# -----------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    path          TEXT    NOT NULL,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    label         TEXT,
+    conf          REAL,
+    p_bike        REAL,
+    p_not         REAL,
+    error         TEXT,
+    classified_at REAL    NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS results_file ON results (path, size, mtime_ns);
+CREATE INDEX IF NOT EXISTS results_label ON results (label, classified_at);
+"""
+
+
+class Journal:
+    """Append-only list of classified files. Remembers what is already done."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def is_done(self, path: str, size: int, mtime_ns: int) -> bool:
+        # Uses the unique index results_file, no need to keep all rows in RAM
+        row = self.conn.execute(
+            "SELECT 1 FROM results WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, size, mtime_ns)
+        ).fetchone()
+        return row is not None
+
+    def add_batch(self, rows: List[Tuple]):
+        """rows: (path, size, mtime_ns, label, conf, p_bike, p_not, error)"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO results "
+                "(path, size, mtime_ns, label, conf, p_bike, p_not, error, classified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in rows]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+# -----------------------------
+# Watchers
+# -----------------------------
+class PollingWatcher:
+    """Fallback: just wait, then the caller rescans the whole folder."""
+
+    name = "polling"
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        time.sleep(timeout)
+        return None  # None = "please rescan everything"
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify via ctypes. wait() returns the changed file paths."""
+
+    name = "inotify"
+
+    def __init__(self, folder: str):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.folder = os.path.realpath(folder)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {folder}")
+
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0")
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                return None  # we missed events -> rescan
+            if name:
+                changed.append(os.path.join(self.folder, os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(folder: str, force_polling: bool = False):
+    if not force_polling:
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError):
+            pass  # not Linux, or inotify not available -> poll
+    return PollingWatcher(folder)
+
+
+# -----------------------------
+# Daemon
+# -----------------------------
+class FolderClassifier:
+    def __init__(self, folder: str, journal: Journal, model, batch_size: int, settle: float):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        # Journal keys must not depend on how the folder was typed
+        self.folder = os.path.realpath(folder)
+        self.journal = journal
+        self.model = model
+        self.batch_size = batch_size
+        self.settle = settle
+        # path -> (size, mtime_ns, time when this size/mtime was first seen)
+        self.pending: Dict[str, Tuple[int, int, float]] = {}
+
+    def scan(self):
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.is_file() and is_image_file(entry.name):
+                    self.observe(entry.path)
+
+    def observe(self, path: str):
+        """Remember a (maybe still growing) file until it has settled."""
+        if not is_image_file(path):
+            return
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self.pending.pop(path, None)
+            return
+        if self.journal.is_done(path, st.st_size, st.st_mtime_ns):
+            self.pending.pop(path, None)
+            return
+        old = self.pending.get(path)
+        if old is None or old[:2] != (st.st_size, st.st_mtime_ns):
+            # New file or still being written -> (re)start the debounce timer
+            self.pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic())
+
+    def ready_files(self) -> List[str]:
+        for path in list(self.pending):
+            self.observe(path)
+        now = time.monotonic()
+        ready = [p for p, (_, _, t) in self.pending.items() if now - t >= self.settle]
+        return sorted(ready, key=lambda p: self.pending[p][2])
+
+    def classify(self, paths: List[str]) -> int:
+        """Classify one batch and write it to the journal. Returns number of files."""
+        rows, arrays, loaded = [], [], []
+        for path in paths:
+            size, mtime_ns, _ = self.pending.pop(path)
+            try:
+                arrays.append(load_image_array(path, target_size=IMG_SIZE))
+                loaded.append((path, size, mtime_ns))
+            except Exception as e:
+                # Broken file: record it so we do not retry it forever
+                rows.append((path, size, mtime_ns, None, None, None, None, str(e)))
+
+        if arrays:
+            batch = np.stack(arrays) / 255.0
+            for (path, size, mtime_ns), (label_key, conf, p_bike, p_not) in zip(loaded, predict_batch(self.model, batch)):
+                rows.append((path, size, mtime_ns, label_key, conf, p_bike, p_not, None))
+                print(f"{label_key:<12} {conf:.3f}  {path}", flush=True)
+
+        self.journal.add_batch(rows)
+        return len(rows)
+
+    def process_ready(self) -> int:
+        done = 0
+        ready = self.ready_files()
+        while ready:
+            done += self.classify(ready[:self.batch_size])
+            ready = ready[self.batch_size:]
+        return done
+
+
+def run(args):
+    if not os.path.isdir(args.folder):
+        raise FileNotFoundError(f"Folder not found: {args.folder}")
+
+    if args.nice:
+        try:
+            os.nice(args.nice)
+        except (AttributeError, OSError):
+            pass
+
+    # Stop on SIGTERM like on Ctrl+C. Each batch is one SQLite transaction,
+    # so an interrupted batch is simply classified again after the restart.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    model = load_any_model()
+    journal = Journal(args.db)
+    watcher = make_watcher(args.folder, force_polling=args.polling)
+    daemon = FolderClassifier(args.folder, journal, model, args.batch_size, args.settle)
+
+    print(f"=== Watching {daemon.folder} ({watcher.name}) -> {args.db} ===")
+    print(f"Already in journal: {journal.count()} files")
+
+    try:
+        daemon.scan()
+        last_scan = time.monotonic()
+        while True:
+            daemon.process_ready()
+
+            if daemon.pending:
+                timeout = args.poll
+            elif isinstance(watcher, PollingWatcher):
+                timeout = args.poll
+            else:
+                timeout = RESCAN_SECONDS
+            changed = watcher.wait(timeout)
+            if changed is None or time.monotonic() - last_scan >= RESCAN_SECONDS:
+                daemon.scan()
+                last_scan = time.monotonic()
+            else:
+                for path in changed:
+                    daemon.observe(path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        journal.close()
+        print("\n=== Stopped. Journal saved. ===")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and classify new images (bicycle / not bicycle)")
+    parser.add_argument("folder", help="folder the camera uploads into")
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite results journal (default: {DB_PATH})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="images per model call")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS, help="seconds a file must stay unchanged")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="polling / re-check interval in seconds")
+    parser.add_argument("--polling", action="store_true", help="do not use inotify, always poll")
+    parser.add_argument("--nice", type=int, default=NICE, help="lower CPU priority by this much (0 = off)")
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error(f"--batch-size must be at least 1, got {args.batch_size}")
+    if args.settle < 0:
+        parser.error(f"--settle must not be negative, got {args.settle:g}")
+    if args.poll <= 0:
+        parser.error(f"--poll must be greater than 0, got {args.poll:g}")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,15 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+from typing import Dict, Optional
 
-import numpy as np
-from PIL import Image, ImageTk
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image as keras_image
+from PIL import Image, ImageDraw, ImageTk
+
+from fahrrad_modell import (
+    MODEL_PATH, TF_AVAILABLE,
+    is_image_file, load_any_model, predict_image, predict_image_tiled,
+)
+from numpy_inferenz import MODEL_NPZ
 
 # ============================================================
 # Kid-friendly Bicycle Detector (EN/DE) for Raspberry Pi OS
@@ -16,23 +19,15 @@ from tensorflow.keras.preprocessing import image as keras_image
 # ============================================================
 # What you need installed in your venv:
 #   pip install tensorflow pillow numpy scipy
+# Without TensorFlow (faster start, less RAM), see numpy_inferenz.py:
+#   pip install pillow numpy h5py
 # Optional for drag & drop:
 #   pip install tkinterdnd2
 # ============================================================
 
-MODEL_PATH = "mein_fahrrad_modell.h5"
-IMG_SIZE = (150, 150)           # must match training
 PREVIEW_MAX = (520, 340)        # preview size on screen
 PATH_MAX_LEN = 60               # how long file paths can be shown before shortening
 
-# Training folder mapping (most common):
-# bicycle = 0, not_bicycle = 1
-# model output = sigmoid -> probability of class 1 (not_bicycle)
-# so:
-#   prob_not_bicycle = pred
-#   prob_bicycle     = 1 - pred
-
-
 # ---------------------------
 # Optional Drag & Drop support
 # ---------------------------
@@ -126,6 +121,7 @@ T: Dict[str, Dict[str, str]] = {
         "btn_open": "Open Image",
         "btn_clear": "Clear",
         "btn_quit": "Quit",
+        "chk_tiled": "Find small bicycles (tiles)",
         "label_language": "Language:",
         "file_none": "File: (none)",
         "result_title": "Result:",
@@ -148,6 +144,7 @@ T: Dict[str, Dict[str, str]] = {
         "btn_open": "Bild öffnen",
         "btn_clear": "Zurücksetzen",
         "btn_quit": "Beenden",
+        "chk_tiled": "Kleine Fahrräder suchen (Kacheln)",
         "label_language": "Sprache:",
         "file_none": "Datei: (keine)",
         "result_title": "Ergebnis:",
@@ -185,33 +182,6 @@ def shorten_path(path: str, max_len: int = PATH_MAX_LEN) -> str:
     return path[:front] + " ... " + path[-back:]
 
 
-def is_image_file(path: str) -> bool:
-    return path.lower().endswith((".jpg", ".jpeg", ".png"))
-
-
-def predict_image(model, path: str) -> Tuple[str, float, float, float]:
-    """
-    Predict one image.
-    Returns:
-      label_key: "BICYCLE" or "NOT_BICYCLE"
-      conf: confidence of the winning label (0..1)
-      p_bike: probability of bicycle (0..1)
-      p_not: probability of not_bicycle (0..1)
-    """
-    img = keras_image.load_img(path, target_size=IMG_SIZE)
-    arr = keras_image.img_to_array(img) / 255.0
-    arr = np.expand_dims(arr, axis=0)
-
-    pred = float(model.predict(arr, verbose=0)[0][0])  # sigmoid output (0..1)
-
-    p_not = pred
-    p_bike = 1.0 - pred
-
-    if p_bike >= p_not:
-        return "BICYCLE", p_bike, p_bike, p_not
-    return "NOT_BICYCLE", p_not, p_bike, p_not
-
-
 @dataclass
 class Colors:
     ok: str = "#1f8f3a"
@@ -320,6 +290,10 @@ class BicycleApp:
         self.btn_quit = tk.Button(btns, text=self._t("btn_quit"), height=2, command=self.root.quit)
         self.btn_quit.pack(fill="x")
 
+        self.tiled_var = tk.BooleanVar(value=False)
+        self.chk_tiled = tk.Checkbutton(btns, text=self._t("chk_tiled"), variable=self.tiled_var, anchor="w")
+        self.chk_tiled.pack(fill="x", pady=(6, 0))
+
         # File label
         self.file_lbl = tk.Label(self.right, text=self._t("file_none"), font=("Arial", 10), wraplength=340, justify="left")
         self.file_lbl.pack(fill="x", pady=(12, 8))
@@ -369,12 +343,13 @@ class BicycleApp:
         self.how_text.configure(state="disabled")
 
     def _load_model_or_exit(self):
-        if not os.path.isfile(MODEL_PATH):
+        have_npz = not TF_AVAILABLE and os.path.isfile(MODEL_NPZ)
+        if not os.path.isfile(MODEL_PATH) and not have_npz:
             self._show_error(self._t("err_model_missing").format(path=MODEL_PATH))
             self.root.after(100, self.root.destroy)
             return
         try:
-            self.model = load_model(MODEL_PATH, compile=False)
+            self.model = load_any_model()
         except Exception as e:
             self._show_error(self._t("err_predict").format(msg=str(e)))
             self.root.after(100, self.root.destroy)
@@ -401,6 +376,7 @@ class BicycleApp:
         self.btn_open.config(text=self._t("btn_open"))
         self.btn_clear.config(text=self._t("btn_clear"))
         self.btn_quit.config(text=self._t("btn_quit"))
+        self.chk_tiled.config(text=self._t("chk_tiled"))
 
         # Keep current file label but update prefix language
         current = self.file_lbl.cget("text")
@@ -493,8 +469,11 @@ class BicycleApp:
 
         # Load preview
         try:
-            pil = Image.open(path).convert("RGB")
-            preview = pil.copy()
+            with Image.open(path) as img:
+                orig_w = img.width
+                # JPEG: decode at reduced size, no full-resolution copy for a thumbnail
+                img.draft("RGB", PREVIEW_MAX)
+                preview = img.convert("RGB")
             preview.thumbnail(PREVIEW_MAX)
             self._preview_imgtk = ImageTk.PhotoImage(preview)
             self.drop_area.config(image=self._preview_imgtk, text="")
@@ -506,11 +485,23 @@ class BicycleApp:
         try:
             if self.model is None:
                 raise RuntimeError("Model is not loaded.")
-            label_key, conf, p_bike, p_not = predict_image(self.model, path)
+            box = None
+            if self.tiled_var.get():
+                label_key, conf, p_bike, p_not, box = predict_image_tiled(self.model, path)
+            else:
+                label_key, conf, p_bike, p_not = predict_image(self.model, path)
         except Exception as e:
             self._show_error(self._t("err_predict").format(msg=str(e)))
             return
 
+        # Outline the bicycle region found in tiled mode
+        if box is not None:
+            k = preview.width / orig_w
+            draw = ImageDraw.Draw(preview)
+            draw.rectangle([int(c * k) for c in box], outline=self.colors.ok, width=3)
+            self._preview_imgtk = ImageTk.PhotoImage(preview)
+            self.drop_area.config(image=self._preview_imgtk, text="")
+
         # Result text in selected language
         if self.lang == "EN":
             result_text = "BICYCLE" if label_key == "BICYCLE" else "NOT BICYCLE"
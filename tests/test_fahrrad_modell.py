@@ -0,0 +1,72 @@
+# Tests for the tiled mode in fahrrad_modell.py (no TensorFlow, no tkinter).
+#
+# Run (inside venv):
+#   python3 -m pytest -q
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FAHRRAD_ENGINE", "numpy")  # never import TensorFlow here
+
+from fahrrad_modell import predict_image, predict_image_tiled, tile_boxes  # noqa: E402
+
+
+class BrightnessModel:
+    """Fake model: the brighter a tile, the more 'bicycle' it is."""
+
+    def predict(self, batch, verbose=0):
+        p_bike = np.minimum(1.0, 2.0 * batch.mean(axis=(1, 2, 3)))
+        return (1.0 - p_bike)[:, None]  # sigmoid output = p_not
+
+
+@pytest.mark.parametrize("width,height,scale", [(400, 300, 1.0), (4000, 3000, 0.3), (1001, 333, 0.5)])
+def test_tile_boxes_cover_image_and_touch_borders(width, height, scale):
+    boxes = tile_boxes(width, height, scale)
+    side = int(round(min(width, height) * scale))
+
+    covered = np.zeros((height, width), dtype=bool)
+    for x0, y0, x1, y1 in boxes:
+        assert x1 - x0 == side and y1 - y0 == side
+        assert 0 <= x0 and 0 <= y0 and x1 <= width and y1 <= height
+        covered[y0:y1, x0:x1] = True
+    assert covered.all()
+
+    assert max(b[2] for b in boxes) == width   # last column touches the right border
+    assert max(b[3] for b in boxes) == height  # last row touches the bottom border
+
+
+def test_tiled_box_maps_back_to_original_pixels(tmp_path):
+    # 4000x3000 photo, dark except a bright 600x600 "bicycle" at (3000, 2000)
+    arr = np.zeros((3000, 4000, 3), dtype=np.uint8)
+    arr[2000:2600, 3000:3600] = 255
+    path = str(tmp_path / "big.jpg")
+    Image.fromarray(arr).save(path, quality=90)
+
+    label_key, conf, p_bike, p_not, box = predict_image_tiled(BrightnessModel(), path, early_exit=1.1)
+
+    assert label_key == "BICYCLE" and box is not None
+    x0, y0, x1, y1 = box
+    # Best window: the smallest scale (0.3 * 3000 = 900 px) around the bright square
+    assert abs((x1 - x0) - 900) <= 8 and abs((y1 - y0) - 900) <= 8
+    assert x1 <= 4000 and y1 <= 3000
+    # Windows sit on a grid, so the box covers the square almost (not always fully)
+    overlap = max(0, min(x1, 3600) - max(x0, 3000)) * max(0, min(y1, 2600) - max(y0, 2000))
+    assert overlap >= 0.9 * 600 * 600
+
+
+def test_small_image_only_gets_whole_photo_check(tmp_path):
+    arr = np.zeros((60, 100, 3), dtype=np.uint8)
+    arr[10:40, 20:60] = 255
+    path = str(tmp_path / "small.png")
+    Image.fromarray(arr).save(path)
+
+    model = BrightnessModel()
+    label_key, conf, p_bike, p_not, box = predict_image_tiled(model, path)
+
+    assert box is None
+    assert (label_key, conf, p_bike, p_not) == pytest.approx(predict_image(model, path))
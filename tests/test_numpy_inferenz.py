@@ -0,0 +1,140 @@
+# Tests for numpy_inferenz.py (no TensorFlow needed).
+#
+# Run (inside venv):
+#   python3 -m pytest -q
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy_inferenz as ni  # noqa: E402
+
+
+def reference_conv2d(x, kernel, bias, strides, padding):
+    """Slow, obvious loop version of Keras Conv2D."""
+    kh, kw = kernel.shape[:2]
+    if padding == "same":
+        x = ni._pad_same(x, (kh, kw), strides)
+    n, h, w, _ = x.shape
+    oh = (h - kh) // strides[0] + 1
+    ow = (w - kw) // strides[1] + 1
+    out = np.zeros((n, oh, ow, kernel.shape[3]), dtype=np.float64)
+    for i in range(oh):
+        for j in range(ow):
+            y0, x0 = i * strides[0], j * strides[1]
+            patch = x[:, y0:y0 + kh, x0:x0 + kw, :]
+            out[:, i, j, :] = np.einsum("nabc,abcf->nf", patch, kernel) + bias
+    return out
+
+
+def reference_max_pool2d(x, pool, strides):
+    n, h, w, c = x.shape
+    oh = (h - pool[0]) // strides[0] + 1
+    ow = (w - pool[1]) // strides[1] + 1
+    out = np.zeros((n, oh, ow, c), dtype=x.dtype)
+    for i in range(oh):
+        for j in range(ow):
+            y0, x0 = i * strides[0], j * strides[1]
+            out[:, i, j, :] = x[:, y0:y0 + pool[0], x0:x0 + pool[1], :].max(axis=(1, 2))
+    return out
+
+
+def small_model(rng):
+    layers = [
+        {"type": "Conv2D", "name": "conv2d", "activation": "relu", "strides": [1, 1], "padding": "valid"},
+        {"type": "MaxPooling2D", "name": "max_pooling2d", "pool_size": [2, 2], "strides": [2, 2], "padding": "valid"},
+        {"type": "Flatten", "name": "flatten"},
+        {"type": "Dense", "name": "dense", "activation": "sigmoid"},
+    ]
+    weights = [
+        [rng.standard_normal((3, 3, 3, 4)).astype(np.float32), rng.standard_normal(4).astype(np.float32)],
+        [],
+        [],
+        [rng.standard_normal((7 * 7 * 4, 1)).astype(np.float32) * 0.1, np.zeros(1, np.float32)],
+    ]
+    return ni.NumpyModel(layers, weights)
+
+
+@pytest.mark.parametrize("strides,padding", [((1, 1), "valid"), ((2, 2), "valid"), ((1, 1), "same"), ((2, 1), "same")])
+def test_conv2d_matches_reference(strides, padding):
+    rng = np.random.default_rng(0)
+    x = rng.random((2, 11, 9, 3)).astype(np.float32)
+    kernel = rng.standard_normal((3, 3, 3, 5)).astype(np.float32)
+    bias = rng.standard_normal(5).astype(np.float32)
+
+    ours = ni.conv2d(x, kernel, bias, strides, padding)
+    ref = reference_conv2d(x.astype(np.float64), kernel, bias, strides, padding)
+
+    assert ours.shape == ref.shape
+    np.testing.assert_allclose(ours, ref, atol=1e-5)
+
+
+@pytest.mark.parametrize("pool,strides", [((2, 2), (2, 2)), ((3, 3), (2, 2)), ((2, 2), (1, 1))])
+def test_max_pool2d_matches_reference(pool, strides):
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((2, 9, 7, 3)).astype(np.float32)
+
+    ours = ni.max_pool2d(x, pool, strides, "valid")
+    ref = reference_max_pool2d(x, pool, strides)
+
+    assert ours.shape == ref.shape
+    np.testing.assert_array_equal(ours, ref)
+
+
+def test_npz_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+    model = small_model(rng)
+    x = rng.random((3, 16, 16, 3)).astype(np.float32)
+
+    path = str(tmp_path / "modell.npz")
+    model.save_npz(path)
+    loaded = ni.load_npz(path)
+
+    assert loaded.layers == model.layers
+    np.testing.assert_array_equal(loaded.predict(x), model.predict(x))
+
+
+def test_load_h5_keras_layout(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    rng = np.random.default_rng(3)
+    model = small_model(rng)
+
+    keras_layers = [{"class_name": "InputLayer", "config": {"name": "input_layer"}}]
+    for spec in model.layers:
+        cfg = {k: v for k, v in spec.items() if k != "type"}
+        keras_layers.append({"class_name": spec["type"], "config": cfg})
+    config = {"class_name": "Sequential", "config": {"name": "sequential", "layers": keras_layers}}
+
+    path = str(tmp_path / "modell.h5")
+    with h5py.File(path, "w") as f:
+        f.attrs["model_config"] = json.dumps(config)
+        root = f.create_group("model_weights")
+        for spec, ws in zip(model.layers, model.weights):
+            g = root.create_group(spec["name"])
+            names = [f"{spec['name']}/{n}:0" for n in ("kernel", "bias")[:len(ws)]]
+            g.attrs["weight_names"] = [n.encode("utf8") for n in names]
+            for name, w in zip(names, ws):
+                g.create_dataset(name, data=w)
+
+    x = rng.random((2, 16, 16, 3)).astype(np.float32)
+    np.testing.assert_allclose(ni.load_h5(path).predict(x), model.predict(x), atol=1e-6)
+
+
+def test_pick_model_file_ignores_stale_npz(tmp_path):
+    h5 = tmp_path / "m.h5"
+    npz = tmp_path / "m.npz"
+    h5.write_bytes(b"")
+    assert ni.pick_model_file(str(h5), str(npz)) == str(h5)
+
+    npz.write_bytes(b"")
+    os.utime(npz, (1000, 1000))
+    os.utime(h5, (2000, 2000))
+    assert ni.pick_model_file(str(h5), str(npz)) == str(h5)  # retrained after export
+
+    os.utime(npz, (3000, 3000))
+    assert ni.pick_model_file(str(h5), str(npz)) == str(npz)
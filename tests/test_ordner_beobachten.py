@@ -0,0 +1,103 @@
+# Tests for ordner_beobachten.py (headless, no TensorFlow, no tkinter).
+#
+# Run (inside venv):
+#   python3 -m pytest -q
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("FAHRRAD_ENGINE", "numpy")  # never import TensorFlow here
+
+from ordner_beobachten import FolderClassifier, Journal  # noqa: E402
+
+
+class StubModel:
+    """Answers 0.2 (-> BICYCLE) for every image and remembers the batch sizes."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, verbose=0):
+        self.batches.append(len(batch))
+        return np.full((len(batch), 1), 0.2, dtype=np.float32)
+
+
+def write_png(path):
+    Image.fromarray(np.zeros((20, 30, 3), dtype=np.uint8)).save(path)
+
+
+def rows(journal):
+    return journal.conn.execute("SELECT path, label, error FROM results ORDER BY path").fetchall()
+
+
+def test_waits_until_file_has_settled(tmp_path):
+    folder = tmp_path / "up"
+    folder.mkdir()
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    model = StubModel()
+    daemon = FolderClassifier(str(folder), journal, model, batch_size=4, settle=0.5)
+
+    write_png(folder / "a.png")
+    daemon.scan()
+    assert daemon.process_ready() == 0  # too new
+
+    time.sleep(0.3)
+    with open(folder / "a.png", "ab") as f:
+        f.write(b"more")  # still being written -> timer starts again
+    time.sleep(0.3)
+    assert daemon.process_ready() == 0  # would be settled without the restart
+
+    time.sleep(0.6)
+    assert daemon.process_ready() == 1
+    assert model.batches == [1]
+
+
+def test_batches_errors_and_resume(tmp_path):
+    folder = tmp_path / "up"
+    folder.mkdir()
+    for i in range(5):
+        write_png(folder / f"{i}.png")
+    (folder / "broken.jpg").write_bytes(b"not an image")
+    (folder / "notes.txt").write_text("ignored")
+    db = str(tmp_path / "j.sqlite")
+
+    journal = Journal(db)
+    model = StubModel()
+    daemon = FolderClassifier(str(folder), journal, model, batch_size=2, settle=0.0)
+    daemon.scan()
+    assert daemon.process_ready() == 6
+    assert sum(model.batches) == 5 and max(model.batches) <= 2
+
+    result = rows(journal)
+    assert len(result) == 6
+    broken = [r for r in result if r[0].endswith("broken.jpg")][0]
+    assert broken[1] is None and broken[2]
+    assert all(r[1] == "BICYCLE" and r[2] is None for r in result if r is not broken)
+    journal.close()
+
+    # Restart, and give the folder in another spelling: nothing is classified again
+    journal = Journal(db)
+    model = StubModel()
+    daemon = FolderClassifier(str(folder) + "/../up", journal, model, batch_size=2, settle=0.0)
+    daemon.scan()
+    assert daemon.process_ready() == 0
+    assert model.batches == []
+
+    write_png(folder / "new.png")
+    daemon.scan()
+    assert daemon.process_ready() == 1
+    assert journal.count() == 7
+    journal.close()
+
+
+def test_batch_size_must_be_positive(tmp_path):
+    journal = Journal(str(tmp_path / "j.sqlite"))
+    with pytest.raises(ValueError):
+        FolderClassifier(str(tmp_path), journal, StubModel(), batch_size=0, settle=0.0)
+    journal.close()